@@ -1,13 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from typing import List, Dict, Any
-from ..services.news_service import create_news_service
+from ..services.news_service import create_news_service, NEWS_SECTIONS
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 @router.get("/latest")
 async def get_latest_news() -> List[Dict[str, Any]]:
     try:
-        # Create and initialize the news service
+        # Get the shared news service
         news_service = await create_news_service()
         
         # Fetch news from all sources
@@ -24,4 +25,19 @@ async def get_latest_news() -> List[Dict[str, Any]]:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch news articles: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.get("/sections")
+async def get_news_sections(
+    section: List[str] = Query(list(NEWS_SECTIONS), description="News sections to fetch")
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Fetch the requested news sections concurrently, each cached separately"""
+    unknown = [name for name in section if name not in NEWS_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown news sections: {', '.join(unknown)}"
+        )
+    
+    news_service = await create_news_service()
+    return await news_service.fetch_sections(list(dict.fromkeys(section)))
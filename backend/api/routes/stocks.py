@@ -1,19 +1,76 @@
 import logging
-from fastapi import APIRouter, Query, Request
-from typing import List, Optional
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from typing import Any, Dict, List, Optional, Tuple
 from api.services.stock_filter import StockFilter
 from api.services.data_fetcher import StockDataFetcher
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
-filter_service = StockFilter()
+router = APIRouter(default_response_class=ORJSONResponse)
+fetcher = StockDataFetcher()
+
+METRICS = [
+    {"name": "price", "description": "Current stock price"},
+    {"name": "marketCap", "description": "Market capitalization"},
+    {"name": "pegRatio", "description": "Price/Earnings to Growth ratio"},
+    {"name": "fcfYield", "description": "Free Cash Flow Yield"},
+    {"name": "roe", "description": "Return on Equity"},
+    {"name": "roa", "description": "Return on Assets"},
+    {"name": "peForward", "description": "Forward P/E ratio"},
+    {"name": "pbRatio", "description": "Price to Book ratio"},
+    {"name": "pFcfRatio", "description": "Price to Free Cash Flow ratio"},
+    {"name": "psRatio", "description": "Price to Sales ratio"},
+    {"name": "epsGrowth3Y", "description": "3-Year EPS Growth"},
+    {"name": "revenueGrowth3Y", "description": "3-Year Revenue Growth"},
+    {"name": "dividendYield", "description": "Dividend Yield"},
+    {"name": "beta", "description": "Beta"},
+]
+
+# (data version, serialized /metrics body)
+_metrics_cache: Optional[Tuple[int, bytes]] = None
+
+async def get_filter_service(
+    refresh: bool = Query(False, description="Re-check the upstream data before filtering")
+) -> StockFilter:
+    """Build a request-scoped filter over the shared screener data"""
+    if refresh:
+        fetcher.invalidate_data()
+    await fetcher.ensure_fresh()
+    return StockFilter(
+        df=fetcher.cached_df,
+        sort_index=fetcher.sort_index,
+        display_df=fetcher.display_df,
+        ticker_index=fetcher.ticker_index,
+        store=fetcher.store
+    )
+
+def to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a DataFrame to records, keeping numpy scalars so float32 values serialize compactly"""
+    columns = df.columns.tolist()
+    return [dict(zip(columns, row)) for row in zip(*(df[col].to_numpy() for col in columns))]
+
+def to_columns(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Convert a DataFrame to a columnar payload: the column names once, then
+    one value array per column. Numeric columns stay numpy arrays so orjson
+    serializes them directly.
+    """
+    columns = df.columns.tolist()
+    data = []
+    for col in columns:
+        values = df[col].to_numpy()
+        data.append(np.ascontiguousarray(values) if values.dtype.kind == 'f' else values.tolist())
+    return {"columns": columns, "data": data}
 
 @router.get("/", include_in_schema=True)
 @router.get("", include_in_schema=True)
 async def get_stocks(
     request: Request,
     page: int = Query(1, description="Page number", ge=1),
-    ticker: Optional[str] = Query(None, description="Filter by ticker symbol"),
+    ticker: Optional[str] = Query(None, description="Filter by ticker symbol prefix"),
     sectors: Optional[List[str]] = Query(None, description="Filter by sectors"),
     min_market_cap: Optional[float] = Query(None, description="Minimum market cap"),
     max_market_cap: Optional[float] = Query(None, description="Maximum market cap"),
@@ -31,29 +88,27 @@ async def get_stocks(
     min_roa: Optional[float] = Query(None, description="Minimum ROA"),
     sort_by: Optional[str] = Query(None, description="Sort field"),
     sort_desc: bool = Query(True, description="Sort descending"),
-    limit: int = Query(50, description="Number of results per page", le=1000)
+    limit: int = Query(50, description="Number of results per page", le=1000),
+    filter_service: StockFilter = Depends(get_filter_service)
 ):
     """Get filtered stock data with pagination"""
-    logger.info(f"Processing request to get_stocks")
-    logger.info(f"Request URL: {request.url}")
-    logger.info(f"Query params: {request.query_params}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Request URL: %s", request.url)
+        logger.debug("Query params: %s", request.query_params)
     
     try:
-        # Reset filters for new request
-        filter_service.reset_filters()
-        
         # Apply all filters
         if ticker:
-            logger.info(f"Filtering by ticker: {ticker}")
+            logger.debug("Filtering by ticker: %s", ticker)
             filter_service.filter_by_ticker(ticker)
         if sectors:
-            logger.info(f"Filtering by sectors: {sectors}")
+            logger.debug("Filtering by sectors: %s", sectors)
             filter_service.filter_by_sector(sectors)
         if min_market_cap is not None or max_market_cap is not None:
-            logger.info(f"Filtering by market cap: min={min_market_cap}, max={max_market_cap}")
+            logger.debug("Filtering by market cap: min=%s, max=%s", min_market_cap, max_market_cap)
             filter_service.filter_by_market_cap(min_market_cap, max_market_cap)
         if min_dividend_yield is not None or max_dividend_yield is not None:
-            logger.info(f"Filtering by dividend yield: min={min_dividend_yield}, max={max_dividend_yield}")
+            logger.debug("Filtering by dividend yield: min=%s, max=%s", min_dividend_yield, max_dividend_yield)
             filter_service.filter_by_dividend_yield(min_dividend_yield, max_dividend_yield)
         if min_peg is not None or max_peg is not None:
             filter_service.filter_by_peg(min_peg, max_peg)
@@ -71,7 +126,6 @@ async def get_stocks(
             filter_service.filter_by_roa(min_roa)
 
         # Get results with pagination
-        logger.info("Getting filtered results")
         results, total_count = filter_service.get_results(
             sort_by=sort_by,
             sort_desc=sort_desc,
@@ -79,32 +133,19 @@ async def get_stocks(
             limit=limit
         )
         
-        # Convert results to dict and handle empty DataFrame
-        if results.empty:
-            logger.info("No results found")
-            return {
-                "data": [],
-                "count": 0,
-                "total_count": 0,
-                "total_pages": 0,
-                "current_page": page,
-                "last_updated": filter_service.fetcher.last_updated
-            }
-            
-        data = results.to_dict(orient="records")
         total_pages = (total_count + limit - 1) // limit
         
-        logger.info(f"Found {len(data)} results")
-        return {
-            "data": data,
-            "count": len(data),
+        logger.debug("Found %d results", len(results))
+        return ORJSONResponse(content={
+            **to_columns(results),
+            "count": len(results),
             "total_count": total_count,
             "total_pages": total_pages,
             "current_page": page,
-            "last_updated": filter_service.fetcher.last_updated
-        }
+            "last_updated": fetcher.last_updated
+        })
     except Exception as e:
-        logger.error(f"Error processing request: {str(e)}")
+        logger.error("Error processing request: %s", e)
         return {
             "status": "error",
             "message": str(e),
@@ -114,68 +155,65 @@ async def get_stocks(
 @router.get("/metrics")
 async def get_available_metrics():
     """Get available metrics for filtering and sorting"""
-    return {
-        "metrics": [
-            {"name": "price", "description": "Current stock price"},
-            {"name": "marketCap", "description": "Market capitalization"},
-            {"name": "pegRatio", "description": "Price/Earnings to Growth ratio"},
-            {"name": "fcfYield", "description": "Free Cash Flow Yield"},
-            {"name": "roe", "description": "Return on Equity"},
-            {"name": "roa", "description": "Return on Assets"},
-            {"name": "peForward", "description": "Forward P/E ratio"},
-            {"name": "pbRatio", "description": "Price to Book ratio"},
-            {"name": "pFcfRatio", "description": "Price to Free Cash Flow ratio"},
-            {"name": "psRatio", "description": "Price to Sales ratio"},
-            {"name": "epsGrowth3Y", "description": "3-Year EPS Growth"},
-            {"name": "revenueGrowth3Y", "description": "3-Year Revenue Growth"},
-            {"name": "dividendYield", "description": "Dividend Yield"},
-            {"name": "beta", "description": "Beta"},
-        ],
-        "sectors": filter_service.get_available_sectors()
-    }
+    global _metrics_cache
+    await fetcher.ensure_fresh()
+    # The sector list only changes when the data refreshes, so serve cached bytes
+    if _metrics_cache is None or _metrics_cache[0] != fetcher.version:
+        content = orjson.dumps({"metrics": METRICS, "sectors": fetcher.sectors})
+        _metrics_cache = (fetcher.version, content)
+    return Response(content=_metrics_cache[1], media_type="application/json")
 
 @router.get("/top-gainers")
 async def get_top_gainers(
     period: str = Query("1w", description="Time period (1w, 1m, 6m, ytd, 1y, 3y)"),
-    limit: int = Query(10, description="Number of stocks to return")
+    limit: int = Query(10, description="Number of stocks to return"),
+    filter_service: StockFilter = Depends(get_filter_service)
 ):
     """Get top gaining stocks"""
     try:
-        results = filter_service.get_top_gainers(period, limit)
-        return {
-            "data": results.to_dict(orient="records"),
+        results = fetcher.get_view(f"top_gainers_{period}", limit)
+        if results is None:
+            results = filter_service.get_top_gainers(period, limit)
+        return ORJSONResponse(content={
+            "data": to_records(results),
             "count": len(results),
-            "last_updated": filter_service.fetcher.last_updated
-        }
+            "last_updated": fetcher.last_updated
+        })
     except Exception as e:
         return {"error": str(e)}
 
 @router.get("/dividend-leaders")
 async def get_dividend_leaders(
-    limit: int = Query(10, description="Number of stocks to return")
+    limit: int = Query(10, description="Number of stocks to return"),
+    filter_service: StockFilter = Depends(get_filter_service)
 ):
     """Get stocks with highest dividend yields"""
     try:
-        results = filter_service.get_highest_dividend_yields(limit)
-        return {
-            "data": results.to_dict(orient="records"),
+        results = fetcher.get_view("dividend_leaders", limit)
+        if results is None:
+            results = filter_service.get_highest_dividend_yields(limit)
+        return ORJSONResponse(content={
+            "data": to_records(results),
             "count": len(results),
-            "last_updated": filter_service.fetcher.last_updated
-        }
+            "last_updated": fetcher.last_updated
+        })
     except Exception as e:
         return {"error": str(e)}
 
 @router.get("/undervalued-growth")
 async def get_undervalued_growth(
-    limit: int = Query(10, description="Number of stocks to return")
+    limit: int = Query(10, description="Number of stocks to return"),
+    filter_service: StockFilter = Depends(get_filter_service)
 ):
     """Get undervalued growth stocks"""
     try:
-        results = filter_service.get_undervalued_growth_stocks(limit)
-        return {
-            "data": results.to_dict(orient="records"),
+        results = fetcher.get_view("undervalued_growth", limit)
+        if results is None:
+            results = filter_service.get_undervalued_growth_stocks(limit)
+        return ORJSONResponse(content={
+            "data": to_records(results),
             "count": len(results),
-            "last_updated": filter_service.fetcher.last_updated
-        }
+            "last_updated": fetcher.last_updated
+        })
     except Exception as e:
         return {"error": str(e)} 
\ No newline at end of file
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Tuple
+
+# Comparison operators usable in (column, op, value) filters, in source form
+# for the generated predicates
+_OP_SYMBOLS = {
+    "ge": ">=",
+    "le": "<=",
+}
+
+# Generated predicates, keyed by the (column index, op) shape of the filters
+_predicate_cache: Dict[Tuple[Tuple[int, str], ...], Callable] = {}
+
+def _compile_predicate(shape: Tuple[Tuple[int, str], ...]) -> Callable:
+    """
+    Generate one function that evaluates a fixed combination of filters as
+    a single & chain over matrix rows, with the thresholds passed in `v`.
+    """
+    terms = " & ".join(
+        f"(m[{col}] {_OP_SYMBOLS[op]} v[{i}])" for i, (col, op) in enumerate(shape)
+    )
+    namespace = {}
+    exec(f"def predicate(m, v):\n    return {terms}\n", namespace)
+    return namespace["predicate"]
+
+class ColumnStore:
+    """
+    Struct-of-arrays copy of the screener DataFrame: one contiguous float32
+    array per numeric column, plus the tickers and the sector category codes.
+    Filters and scores read these arrays directly; pandas is only used to
+    gather the result rows.
+    The numeric columns are rows of a single (columns x stocks) matrix, so the
+    generated predicates can address any of them by index. A cached "value > 0" mask
+    per column (False for missing values) serves the screener candidate checks.
+    """
+
+    def __init__(
+        self,
+        columns: List[str],
+        matrix: np.ndarray,
+        tickers: np.ndarray,
+        sector_codes: np.ndarray,
+        sector_categories: pd.Index
+    ):
+        self.matrix = matrix
+        self.column_index = {col: i for i, col in enumerate(columns)}
+        self.arrays = {col: matrix[i] for i, col in enumerate(columns)}
+        self.positive = {col: matrix[i] > 0 for i, col in enumerate(columns)}
+        self.tickers = tickers
+        self.sector_codes = sector_codes
+        self.sector_categories = sector_categories
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ColumnStore":
+        """Split a screener DataFrame into per-column arrays"""
+        columns = [
+            col for col in df.columns
+            if col not in ("ticker", "sector") and pd.api.types.is_numeric_dtype(df[col])
+        ]
+        matrix = np.ascontiguousarray(df[columns].to_numpy(dtype='float32').T)
+        sector = df['sector'].astype('category')
+        return cls(
+            columns=columns,
+            matrix=matrix,
+            tickers=df['ticker'].to_numpy(dtype=object),
+            sector_codes=sector.cat.codes.to_numpy(),
+            sector_categories=sector.cat.categories
+        )
+
+    def filter_mask(self, filters: List[Tuple[str, str, float]]) -> np.ndarray:
+        """Evaluate (column, op, value) filters into one boolean row mask"""
+        # Order the filters so every combination of the same predicates
+        # shares one generated function
+        indexed = sorted(
+            ((self.column_index[col], op, value) for col, op, value in filters),
+            key=lambda f: f[:2]
+        )
+        shape = tuple((col, op) for col, op, _ in indexed)
+        # Compare in float32 like numpy does against the float32 columns;
+        # out-of-range thresholds become +/-inf, which compares the same way
+        with np.errstate(over='ignore'):
+            thresholds = np.array([value for _, _, value in indexed], dtype=np.float32)
+        
+        predicate = _predicate_cache.get(shape)
+        if predicate is None:
+            predicate = _predicate_cache[shape] = _compile_predicate(shape)
+        return predicate(self.matrix, thresholds)
@@ -1,20 +1,103 @@
-import requests
+import asyncio
+import httpx
+import ijson
+import numpy as np
 import pandas as pd
-import json
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
-from typing import Dict, Any
+import shutil
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import logging
+from api.services.column_store import ColumnStore
+from api.services.http_client import get_http_client, close_http_client
+from api.services.stock_filter import StockFilter, PERIOD_MAP
 
 logger = logging.getLogger(__name__)
 
+# Screener API field -> DataFrame column
+COLUMN_MAP = {
+    "price": "price",
+    "marketCap": "market_cap",
+    "pegRatio": "peg_ratio",
+    "fcfYield": "fcf_yield",
+    "roe": "roe",
+    "roa": "roa",
+    "revenue": "revenue",
+    "operatingIncome": "operating_income",
+    "netIncome": "net_income",
+    "fcf": "fcf",
+    "eps": "eps",
+    "sector": "sector",
+    "peForward": "pe_forward",
+    "pbRatio": "pb_ratio",
+    "psRatio": "ps_ratio",
+    "epsGrowth3Y": "eps_growth_3y",
+    "revenueGrowth3Y": "revenue_growth_3y",
+    "debtEquity": "debt_equity",
+    "beta": "beta",
+    "dividendYield": "dividend_yield",
+    "payoutRatio": "payout_ratio",
+    "dividendGrowth": "dividend_growth",
+    "analystRatings": "analyst_rating",
+    "analystCount": "analyst_count",
+    "priceTarget": "price_target",
+    "priceTargetChange": "price_target_change",
+    "ch1w": "change_1w",
+    "ch1m": "change_1m",
+    "ch6m": "change_6m",
+    "chYTD": "change_ytd",
+    "ch1y": "change_1y",
+    "ch3y": "change_3y",
+}
+API_FIELDS = list(COLUMN_MAP)
+COLUMNS = ["ticker"] + list(COLUMN_MAP.values())
+NUMERIC_COLUMNS = [col for col in COLUMNS if col not in ("ticker", "sector")]
+
+# Number of rows kept in each precomputed screener view
+VIEW_SIZE = 100
+
+class _AsyncByteReader:
+    """Async file-like adapter so ijson can read an httpx byte stream"""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""
+        if not self._buffer:
+            try:
+                self._buffer = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                return b""
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
 class StockDataFetcher:
     def __init__(self):
         self.api_url = "https://stockanalysis.com/api/screener/s/bd/price+marketCap+pegRatio+fcfYield+roe+roa+revenue+operatingIncome+netIncome+fcf+eps+ch1w+ch1m+ch6m+chYTD+ch1y+ch3y+sector+peForward+pbRatio+pFcfRatio+psRatio+epsGrowth3Y+revenueGrowth3Y+debtEquity+beta+dps+dividendYield+payoutRatio+dividendGrowth+payoutFrequency+analystRatings+analystCount+priceTarget+priceTargetChange.json"
         self.data_dir = "data"
         os.makedirs(self.data_dir, exist_ok=True)
-        self._data = None
+        self._df: Optional[pd.DataFrame] = None
+        self._display_df: Optional[pd.DataFrame] = None
         self._last_updated = None
+        self._last_checked = None
+        self._last_attempt = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._ttl = timedelta(minutes=10)
+        self._retry_backoff = timedelta(seconds=30)
+        self._lock = asyncio.Lock()
+        self._views: Dict[str, pd.DataFrame] = {}
+        self._sort_index: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._ticker_index: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._store: Optional[ColumnStore] = None
+        self._sectors: List[str] = []
+        self._version = 0
 
     @property
     def last_updated(self) -> str:
@@ -23,107 +106,232 @@ class StockDataFetcher:
             return self._last_updated.isoformat()
         return None
 
-    def get_dataframe(self) -> pd.DataFrame:
-        """Get the data as a pandas DataFrame"""
-        raw_data = self.fetch_data()
-        return self.process_data(raw_data)
+    @property
+    def version(self) -> int:
+        """Counter bumped every time a new DataFrame is loaded"""
+        return self._version
+
+    @property
+    def sort_index(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Precomputed (ascending, descending) row orders per numeric column"""
+        return self._sort_index
+
+    @property
+    def sectors(self) -> List[str]:
+        """Sorted sectors present in the cached DataFrame"""
+        return self._sectors
+
+    @property
+    def store(self) -> Optional[ColumnStore]:
+        """Column arrays of the cached DataFrame, for the filters"""
+        return self._store
+
+    @property
+    def ticker_index(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Sorted uppercase tickers and the row position of each"""
+        return self._ticker_index
+
+    @property
+    def display_df(self) -> Optional[pd.DataFrame]:
+        """Copy of the cached DataFrame with numeric values rounded for responses"""
+        return self._display_df
+
+    @property
+    def cached_df(self) -> pd.DataFrame:
+        """Get the shared processed DataFrame (empty until loaded)"""
+        if self._df is None:
+            return pd.DataFrame(columns=COLUMNS).astype({**dict.fromkeys(NUMERIC_COLUMNS, 'float32'), 'sector': 'category'})
+        return self._df
+
+    def get_view(self, name: str, limit: int) -> Optional[pd.DataFrame]:
+        """
+        Get the first `limit` rows of a precomputed screener view.
+        Returns None if the view does not exist or is too short for `limit`.
+        """
+        view = self._views.get(name)
+        if view is None or not 0 <= limit <= VIEW_SIZE:
+            return None
+        return view.head(limit)
+
+    def _build_display_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Round numeric values once so responses carry short float32 values"""
+        display_df = df.copy()
+        display_df[NUMERIC_COLUMNS] = display_df[NUMERIC_COLUMNS].round(4).astype('float32')
+        return display_df
+
+    def _build_views(
+        self,
+        df: pd.DataFrame,
+        display_df: pd.DataFrame,
+        store: ColumnStore
+    ) -> Dict[str, pd.DataFrame]:
+        """Precompute the top-N screener results, which only change on refresh"""
+        screener = StockFilter(df, display_df=display_df, store=store)
+        views = {
+            f"top_gainers_{period}": screener.get_top_gainers(period, VIEW_SIZE)
+            for period in PERIOD_MAP
+        }
+        views["dividend_leaders"] = screener.get_highest_dividend_yields(VIEW_SIZE)
+        views["undervalued_growth"] = screener.get_undervalued_growth_stocks(VIEW_SIZE)
+        return views
+
+    def _build_sort_index(self, df: pd.DataFrame) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Precompute stable ascending and descending row orders for each numeric column"""
+        sort_index = {}
+        for col in NUMERIC_COLUMNS:
+            values = df[col].to_numpy()
+            sort_index[col] = (np.argsort(values, kind='stable'), np.argsort(-values, kind='stable'))
+        return sort_index
+
+    def _build_ticker_index(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Sort the uppercase tickers once so ticker lookups are a binary search"""
+        tickers = df['ticker'].str.upper().to_numpy(dtype=str)
+        order = np.argsort(tickers, kind='stable')
+        return tickers[order], order
 
-    def fetch_data(self) -> Dict[str, Any]:
+    def _is_fresh(self) -> bool:
+        """Check whether the cached DataFrame is still within its TTL"""
+        return (
+            self._df is not None
+            and self._last_checked is not None
+            and datetime.now() - self._last_checked < self._ttl
+        )
+
+    def _in_backoff(self) -> bool:
+        """Check whether an upstream fetch was attempted too recently to retry"""
+        return (
+            self._last_attempt is not None
+            and datetime.now() - self._last_attempt < self._retry_backoff
+        )
+
+    def invalidate_data(self):
         """
-        Fetch stock data from the API
+        Expire the cached DataFrame so the next ensure_fresh() checks the API,
+        once the retry backoff of the last attempt has passed.
+        The current frame keeps being served until the refresh succeeds.
+        """
+        self._last_checked = None
+
+    async def ensure_fresh(self, force: bool = False) -> pd.DataFrame:
         """
+        Make sure the processed DataFrame is loaded and within its TTL.
+        Concurrent callers share a single upstream fetch, and the previous
+        frame keeps being served until a refresh succeeds. After an attempt,
+        failed or not, the upstream is not retried within the retry backoff,
+        so callers queued behind a failed fetch get the current frame.
+        With force=True the upstream is checked even if the TTL has not expired.
+        """
+        if not force:
+            if self._is_fresh():
+                return self._df
+            if self._df is not None and (self._lock.locked() or self._in_backoff()):
+                # A refresh is in flight or just failed, serve the stale frame meanwhile
+                return self._df
+        async with self._lock:
+            if force or not (self._is_fresh() or self._in_backoff()):
+                await self._fetch_and_process()
+        return self.cached_df
+
+    async def _fetch_and_process(self):
+        """Fetch and process fresh data, keeping the previous frame on failure"""
+        try:
+            df = await self.get_dataframe()
+        finally:
+            self._last_attempt = datetime.now()
+        if not df.empty and df is not self._df:
+            display_df = self._build_display_df(df)
+            store = ColumnStore.from_frame(df)
+            self._views = self._build_views(df, display_df, store)
+            self._sort_index = self._build_sort_index(df)
+            self._ticker_index = self._build_ticker_index(df)
+            self._display_df = display_df
+            self._store = store
+            self._sectors = store.sector_categories.tolist()
+            self._df = df
+            self._version += 1
+
+    async def get_dataframe(self) -> pd.DataFrame:
+        """Get the data as a pandas DataFrame, reusing the cached one if upstream is unchanged"""
+        records = await self.fetch_data()
+        if records is None:
+            return self._df
+        return self.process_data(records)
+
+    async def fetch_data(self) -> Optional[Dict[str, tuple]]:
+        """
+        Stream stock data from the API.
+        Ticker records are parsed incrementally and reduced to tuples of the
+        API_FIELDS values, so the full JSON document is never held in memory.
+        Once a DataFrame is cached the request is conditional, and None is
+        returned when the API answers 304 Not Modified.
+        """
+        headers = {}
+        if self._df is not None:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
         try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
             logger.info("Fetching data from API...")
-            response = requests.get(self.api_url, headers=headers)
-            response.raise_for_status()
+            async with get_http_client().stream("GET", self.api_url, headers=headers) as response:
+                if response.status_code == 304:
+                    logger.info("Data not modified since last fetch")
+                    self._last_checked = datetime.now()
+                    return None
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+
+                records = {}
+                stream = _AsyncByteReader(response.aiter_bytes())
+                async for ticker, stock in ijson.kvitems_async(stream, 'data.data', use_float=True):
+                    if isinstance(stock, dict):
+                        records[ticker] = tuple(map(stock.get, API_FIELDS))
+
             logger.info("Successfully fetched data")
-            self._data = response.json()
-            self._last_updated = datetime.now()
-            return self._data
-        except requests.RequestException as e:
+            self._etag = response.headers.get("ETag")
+            self._last_modified = response.headers.get("Last-Modified")
+            self._last_updated = self._last_checked = datetime.now()
+            return records
+        except ijson.JSONError as e:
+            logger.error(f"Error parsing data: {e}")
+            return {}
+        except httpx.HTTPError as e:
             logger.error(f"Error fetching data: {e}")
-            if hasattr(e.response, 'text'):
+            if isinstance(e, httpx.HTTPStatusError):
                 logger.error(f"Response text: {e.response.text}")
             return {}
 
-    def process_data(self, raw_data: Dict[str, Any]) -> pd.DataFrame:
+    def process_data(self, records: Dict[str, tuple]) -> pd.DataFrame:
         """
-        Process raw JSON data into a pandas DataFrame
+        Process streamed ticker records into a pandas DataFrame
         """
         try:
-            logger.debug("Processing raw data")
-            logger.debug(f"Raw data type: {type(raw_data)}")
-            logger.debug(f"Raw data keys: {raw_data.keys() if isinstance(raw_data, dict) else 'Not a dict'}")
-            
-            # Extract the data from the nested structure
-            if not isinstance(raw_data, dict) or 'data' not in raw_data:
-                logger.error("Invalid data structure - missing 'data' key")
-                return pd.DataFrame()
-
-            data = raw_data.get('data', {}).get('data', {})
-            logger.debug(f"Extracted data type: {type(data)}")
-            logger.debug(f"Number of stocks: {len(data) if isinstance(data, dict) else 'Not a dict'}")
-            
-            if not isinstance(data, dict):
-                logger.error("Invalid data structure - expected dictionary")
+            logger.debug("Processing stock records")
+            if not records:
+                logger.error("No stock records to process")
                 return pd.DataFrame()
 
-            stocks_data = []
-            for ticker, stock in data.items():
-                if not isinstance(stock, dict):
-                    continue
-
-                try:
-                    stock_dict = {
-                        "ticker": ticker,
-                        "price": self._safe_float(stock.get("price")),
-                        "market_cap": self._safe_float(stock.get("marketCap")),
-                        "peg_ratio": self._safe_float(stock.get("pegRatio")),
-                        "fcf_yield": self._safe_float(stock.get("fcfYield")),
-                        "roe": self._safe_float(stock.get("roe")),
-                        "roa": self._safe_float(stock.get("roa")),
-                        "revenue": self._safe_float(stock.get("revenue")),
-                        "operating_income": self._safe_float(stock.get("operatingIncome")),
-                        "net_income": self._safe_float(stock.get("netIncome")),
-                        "fcf": self._safe_float(stock.get("fcf")),
-                        "eps": self._safe_float(stock.get("eps")),
-                        "sector": str(stock.get("sector", "")),
-                        "pe_forward": self._safe_float(stock.get("peForward")),
-                        "pb_ratio": self._safe_float(stock.get("pbRatio")),
-                        "ps_ratio": self._safe_float(stock.get("psRatio")),
-                        "eps_growth_3y": self._safe_float(stock.get("epsGrowth3Y")),
-                        "revenue_growth_3y": self._safe_float(stock.get("revenueGrowth3Y")),
-                        "debt_equity": self._safe_float(stock.get("debtEquity")),
-                        "beta": self._safe_float(stock.get("beta")),
-                        "dividend_yield": self._safe_float(stock.get("dividendYield")),
-                        "payout_ratio": self._safe_float(stock.get("payoutRatio")),
-                        "dividend_growth": self._safe_float(stock.get("dividendGrowth")),
-                        "analyst_rating": self._safe_float(stock.get("analystRatings")),
-                        "analyst_count": self._safe_float(stock.get("analystCount")),
-                        "price_target": self._safe_float(stock.get("priceTarget")),
-                        "price_target_change": self._safe_float(stock.get("priceTargetChange")),
-                        "change_1w": self._safe_float(stock.get("ch1w")),
-                        "change_1m": self._safe_float(stock.get("ch1m")),
-                        "change_6m": self._safe_float(stock.get("ch6m")),
-                        "change_ytd": self._safe_float(stock.get("chYTD")),
-                        "change_1y": self._safe_float(stock.get("ch1y")),
-                        "change_3y": self._safe_float(stock.get("ch3y"))
-                    }
-                    stocks_data.append(stock_dict)
-                except Exception as e:
-                    logger.error(f"Error processing stock {ticker}: {e}")
-                    continue
-
-            logger.info(f"Processed {len(stocks_data)} stocks")
-            df = pd.DataFrame(stocks_data)
+            df = pd.DataFrame.from_records(
+                list(records.values()),
+                columns=list(COLUMN_MAP.values()),
+                index=pd.Index(list(records), name='ticker')
+            )
+            df = df.reset_index()
+            logger.info(f"Processed {len(df)} stocks")
             logger.debug(f"DataFrame shape: {df.shape}")
             logger.debug(f"DataFrame columns: {df.columns.tolist()}")
+
+            # Convert numeric columns in bulk, coercing bad values to NaN
+            df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].apply(pd.to_numeric, errors='coerce')
             
             # Replace infinite values with NaN and then 0
-            df = df.replace([float('inf'), float('-inf')], float('nan')).fillna(0)
+            df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].replace([np.inf, -np.inf], np.nan).fillna(0)
+
+            # Downcast to compact dtypes so filters and sorts scan less memory
+            df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].astype('float32')
+            df['sector'] = df['sector'].fillna('').astype(str).astype('category')
+            df['ticker'] = df['ticker'].astype('string[pyarrow]')
             
             return df
 
@@ -133,44 +341,53 @@ class StockDataFetcher:
             logger.error(traceback.format_exc())
             return pd.DataFrame()
 
-    def _safe_float(self, value) -> float:
-        """Safely convert value to float, return 0 if not possible"""
-        if value is None:
-            return 0.0
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return 0.0
-
     def save_data(self, df: pd.DataFrame) -> str:
         """
-        Save the processed data to CSV with timestamp
+        Save the processed data to Parquet with timestamp
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"scrynt_data_{timestamp}.csv"
+        filename = f"scrynt_data_{timestamp}.parquet"
         filepath = os.path.join(self.data_dir, filename)
         
-        df.to_csv(filepath, index=False)
+        df.to_parquet(filepath, engine='pyarrow', compression='zstd', index=False)
         logger.info(f"Data saved to {filepath}")
         
-        # Also save a copy as the latest version
-        latest_filepath = os.path.join(self.data_dir, "scrynt_data_latest.csv")
-        df.to_csv(latest_filepath, index=False)
+        # Also save a copy as the latest version, swapped in atomically so
+        # readers never see a partially written file
+        latest_filepath = os.path.join(self.data_dir, "scrynt_data_latest.parquet")
+        tmp_filepath = f"{latest_filepath}.tmp"
+        shutil.copyfile(filepath, tmp_filepath)
+        os.replace(tmp_filepath, latest_filepath)
         
         return filepath
 
-def main():
+async def periodic_refresh(fetcher: StockDataFetcher, interval: float = 600):
+    """
+    Keep the fetcher's data warm by refreshing it every `interval` seconds,
+    so requests are served from memory instead of waiting on the API.
+    """
+    while True:
+        try:
+            await fetcher.ensure_fresh(force=True)
+        except Exception as e:
+            logger.error(f"Background refresh failed: {e}")
+        await asyncio.sleep(interval)
+
+async def main():
     fetcher = StockDataFetcher()
     
     print("Fetching stock data...")
-    raw_data = fetcher.fetch_data()
+    try:
+        records = await fetcher.fetch_data()
+    finally:
+        await close_http_client()
     
-    if not raw_data:
+    if not records:
         print("Failed to fetch data. Exiting...")
         return
     
     print("Processing data...")
-    df = fetcher.process_data(raw_data)
+    df = fetcher.process_data(records)
     
     if df.empty:
         print("No data processed. Exiting...")
@@ -184,7 +401,7 @@ def main():
     
     filepath = fetcher.save_data(df)
     print(f"\nData has been saved to {filepath}")
-    print("A copy has also been saved as 'scrynt_data_latest.csv'")
+    print("A copy has also been saved as 'scrynt_data_latest.parquet'")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file
@@ -1,8 +1,27 @@
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from typing import Iterator, List, Dict, Optional
 from datetime import datetime, timezone, timedelta
 import re
-from playwright.async_api import async_playwright
+import asyncio
+import httpx
+from playwright.async_api import async_playwright, Browser, Playwright, Route
+from .http_client import get_http_client
+
+# Shared browser, launched once and reused across scrapes
+_playwright: Optional[Playwright] = None
+_browser: Optional[Browser] = None
+_browser_lock = asyncio.Lock()
+
+_BLOCKED_RESOURCE_TYPES = {"image", "stylesheet", "font", "media"}
+
+# Whether each news page needs browser rendering, by URL; absent until detected
+_use_browser: Dict[str, bool] = {}
+
+# Class pattern for the news containers, compiled once
+_CONTAINER_CLASS = re.compile(r'gap-4 border-gray-300 bg-default p-4')
+
+# Only build the tree for news containers, skipping the rest of the page
+_NEWS_STRAINER = SoupStrainer('div', class_=_CONTAINER_CLASS)
 
 class FlexNewsArticle:
     def __init__(
@@ -34,86 +53,160 @@ class FlexNewsArticle:
 def parse_timestamp_source(timestamp_text: str) -> tuple[str, str]:
     """Parse timestamp and source from the combined text."""
     # Example: "27 minutes ago - FXEmpire"
-    parts = timestamp_text.split(" - ")
-    if len(parts) == 2:
-        return parts[0].strip(), parts[1].strip()
-    return timestamp_text, ""
+    timestamp, _, source = timestamp_text.partition(" - ")
+    return timestamp.strip(), source.strip()
 
-def scrape_flex_news_articles(html_content: str, max_articles: int = 8) -> List[FlexNewsArticle]:
+def _find_article_elements(container: Tag) -> tuple:
     """
-    Scrape news articles from HTML content using the new structure.
-    Returns a list of FlexNewsArticle objects.
+    Find the title link, image, description and timestamp elements of a
+    news container in a single walk over its descendants.
+    """
+    title_link = img_tag = desc_elem = time_source_elem = None
+    for elem in container.find_all(['h3', 'img', 'p', 'div']):
+        if elem.name == 'h3':
+            if title_link is None:
+                title_link = elem.find('a')
+        elif elem.name == 'img':
+            if img_tag is None:
+                img_tag = elem
+        elif elem.name == 'p':
+            if desc_elem is None and 'overflow-auto' in elem.get('class', ()):
+                desc_elem = elem
+        elif time_source_elem is None and 'text-faded' in elem.get('class', ()):
+            time_source_elem = elem
+    return title_link, img_tag, desc_elem, time_source_elem
+
+def _iter_articles(html_content: str, max_articles: int = 8) -> Iterator[Dict]:
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    articles = []
+    Parse news articles from HTML content using the new structure.
+    Yields a dictionary of article information per news container.
+    """
+    soup = BeautifulSoup(html_content, features='lxml', parse_only=_NEWS_STRAINER)
     
     # Find all news article containers with the new class structure
-    news_containers = soup.find_all('div', class_=lambda x: x and 'gap-4 border-gray-300 bg-default p-4' in x)
+    news_containers = soup.find_all('div', class_=_CONTAINER_CLASS)
     
     for container in news_containers[:max_articles]:  # Limit to max_articles
         try:
+            title_link, img_tag, desc_elem, time_source_elem = _find_article_elements(container)
+            if title_link is None:
+                continue
+            
             # Extract title and URL from the h3 > a element
-            title_link = container.find('h3').find('a')
             title = title_link.get_text(strip=True)
             url = title_link['href']
             
             # Extract image URL from img tag
-            img_tag = container.find('img')
             image_url = img_tag['src'] if img_tag else ""
             
             # Extract description from p tag with overflow-auto class
-            desc_elem = container.find('p', class_=lambda x: x and 'overflow-auto' in x)
             description = desc_elem.get_text(strip=True) if desc_elem else ""
             
             # Extract timestamp and source from div with text-faded class
-            time_source_elem = container.find('div', class_=lambda x: x and 'text-faded' in x)
             timestamp, source = "", ""
             if time_source_elem:
                 timestamp, source = parse_timestamp_source(time_source_elem.get_text(strip=True))
             
-            article = FlexNewsArticle(
-                title=title,
-                url=url,
-                image_url=image_url,
-                description=description,
-                timestamp=timestamp,
-                source=source
-            )
-            articles.append(article)
-            
         except Exception as e:
             print(f"Error parsing article: {str(e)}")
             continue
+        
+        yield {
+            "title": title,
+            "url": url,
+            "image_url": image_url,
+            "description": description,
+            "timestamp": timestamp,
+            "source": source
+        }
+
+def scrape_flex_news_articles(html_content: str, max_articles: int = 8) -> List[FlexNewsArticle]:
+    """
+    Scrape news articles from HTML content using the new structure.
+    Returns a list of FlexNewsArticle objects.
+    """
+    return [FlexNewsArticle(**article) for article in _iter_articles(html_content, max_articles)]
+
+async def get_browser() -> Browser:
+    """Get the shared Chromium instance, launching it on first use"""
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            print("Launching browser...")
+            _browser = await _playwright.chromium.launch(args=["--disable-dev-shm-usage", "--no-sandbox"])
+    return _browser
+
+async def close_browser():
+    """Close the shared browser and stop Playwright"""
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is not None:
+            await _browser.close()
+            _browser = None
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
+
+async def _block_static_assets(route: Route):
+    """Abort requests for assets the scraper does not need to read the DOM"""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def _fetch_static(url: str) -> str:
+    """Fetch the server-rendered HTML of a page without a browser"""
+    response = await get_http_client().get(url)
+    response.raise_for_status()
+    return response.text
+
+async def _fetch_rendered(url: str) -> str:
+    """Render a page in the shared browser and return its HTML"""
+    browser = await get_browser()
+    context = await browser.new_context()
     
-    return articles
+    try:
+        print("Creating new page...")
+        page = await context.new_page()
+        await page.route("**/*", _block_static_assets)
+        
+        print("Navigating to news page...")
+        await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        
+        # Wait for the news container to be visible
+        await page.wait_for_selector('div[class*="gap-4 border-gray-300"]', timeout=60000)
+        
+        # Get the page content after JavaScript has rendered
+        return await page.content()
+        
+    finally:
+        await context.close()
 
 async def scrape_flex_news_from_url(url: str = "https://stockanalysis.com/news/all-stocks/") -> List[Dict]:
     """
-    Scrape news articles from the specified URL using Playwright.
+    Scrape news articles from the specified URL.
+    The server-rendered HTML is tried first; Playwright is only used when
+    the static page turns out to have no articles.
     Returns a list of dictionaries containing article information.
     """
-    print("Launching browser...")
-    async with async_playwright() as p:
-        print("Creating new page...")
-        browser = await p.chromium.launch()
-        page = await browser.new_page()
+    try:
+        if _use_browser.get(url) is not True:
+            try:
+                articles = list(_iter_articles(await _fetch_static(url)))
+                if articles:
+                    _use_browser[url] = False
+                    return articles
+                if url not in _use_browser:
+                    print(f"No articles in static HTML of {url}, using browser rendering for it from now on")
+                    _use_browser[url] = True
+            except httpx.HTTPError as e:
+                print(f"Static fetch of {url} failed: {str(e)}")
         
-        try:
-            print("Navigating to news page...")
-            await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            
-            # Wait for the news container to be visible
-            await page.wait_for_selector('div[class*="gap-4 border-gray-300"]', timeout=60000)
-            
-            # Get the page content after JavaScript has rendered
-            content = await page.content()
-            articles = scrape_flex_news_articles(content)
-            return [article.to_dict() for article in articles]
-            
-        except Exception as e:
-            print(f"Error scraping URL {url}: {str(e)}")
-            print(f"Error details: {type(e).__name__}")
-            return []
-            
-        finally:
-            await browser.close() 
\ No newline at end of file
+        return list(_iter_articles(await _fetch_rendered(url)))
+        
+    except Exception as e:
+        print(f"Error scraping URL {url}: {str(e)}")
+        print(f"Error details: {type(e).__name__}")
+        return []
@@ -1,50 +1,109 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import asyncio
 import httpx
 from datetime import datetime, timezone, timedelta
 from .news_scraper import scrape_flex_news_from_url
 
+# News sections that can be fetched by name
+NEWS_SECTIONS = {
+    "all-stocks": "https://stockanalysis.com/news/all-stocks/",
+    "press-releases": "https://stockanalysis.com/news/press-releases/",
+}
+
 class NewsService:
     """Service for fetching news from stockanalysis.com with caching"""
-    
+
     def __init__(self):
-        self._cached_articles = None
-        self._last_updated = None
+        # Cache state is kept per news page URL
+        self._cached_articles: Dict[str, List[Dict]] = {}
+        self._last_updated: Dict[str, datetime] = {}
         self._cache_duration = timedelta(hours=6)
-    
+        self._max_stale = timedelta(hours=24)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+
+    def _is_fresh(self, url: str, now: datetime) -> bool:
+        """Check whether the cached articles of a page are still within the cache duration"""
+        return (
+            url in self._cached_articles
+            and url in self._last_updated
+            and now - self._last_updated[url] < self._cache_duration
+        )
+
     async def fetch_all_news(self) -> List[Dict]:
-        """Fetch news by scraping stockanalysis.com with caching"""
+        """Fetch the all-stocks news page with caching"""
+        return await self.fetch_news(NEWS_SECTIONS["all-stocks"])
+
+    async def fetch_sections(self, names: List[str]) -> Dict[str, List[Dict]]:
+        """Fetch several news sections concurrently, each with its own cache entry"""
+        results = await asyncio.gather(*(self.fetch_news(NEWS_SECTIONS[name]) for name in names))
+        return dict(zip(names, results))
+
+    async def fetch_news(self, url: str) -> List[Dict]:
+        """
+        Fetch news by scraping a stockanalysis.com page with caching.
+        Stale articles are served while a background refresh runs, until
+        they pass the hard expiry.
+        """
         now = datetime.now(timezone.utc)
-        
+
         # Return cached articles if they're still fresh
-        if self._cached_articles is not None and self._last_updated is not None:
-            time_since_update = now - self._last_updated
+        cached = self._cached_articles.get(url)
+        last_updated = self._last_updated.get(url)
+        if cached is not None and last_updated is not None:
+            time_since_update = now - last_updated
             if time_since_update < self._cache_duration:
-                print(f"Returning cached news articles (cached {time_since_update.total_seconds() / 3600:.1f} hours ago)")
-                return self._cached_articles
-        
-        print("Cache expired or not initialized, fetching fresh news...")
+                print(f"Returning cached news articles for {url} (cached {time_since_update.total_seconds() / 3600:.1f} hours ago)")
+                return cached
+            if time_since_update < self._max_stale:
+                if url not in self._refresh_tasks:
+                    self._refresh_tasks[url] = asyncio.create_task(self._refresh(url))
+                print(f"Returning stale news articles for {url} while refreshing in the background")
+                return cached
+
+        print(f"Cache expired or not initialized for {url}, fetching fresh news...")
+        return await self._refresh(url)
+
+    async def _refresh(self, url: str) -> List[Dict]:
+        """Scrape fresh articles, letting only one scrape per page run at a time"""
         try:
-            articles = await scrape_flex_news_from_url()
-            if articles:
-                self._cached_articles = articles
-                self._last_updated = now
-                print(f"Successfully cached {len(articles)} articles")
-                return articles
-            elif self._cached_articles:
-                print("Failed to fetch fresh articles, returning stale cache as fallback")
-                return self._cached_articles
-            else:
-                print("No articles available (both fetch failed and no cache)")
-                return []
-                
-        except Exception as e:
-            print(f"Error fetching news: {e}")
-            print(f"Error details: {type(e).__name__}")
-            if self._cached_articles:
-                print("Returning stale cache due to error")
-                return self._cached_articles
-            return []
+            async with self._locks.setdefault(url, asyncio.Lock()):
+                # Another caller may have refreshed the cache while we waited
+                now = datetime.now(timezone.utc)
+                if self._is_fresh(url, now):
+                    return self._cached_articles[url]
+
+                cached = self._cached_articles.get(url)
+                try:
+                    articles = await scrape_flex_news_from_url(url)
+                    if articles:
+                        self._cached_articles[url] = articles
+                        self._last_updated[url] = now
+                        print(f"Successfully cached {len(articles)} articles for {url}")
+                        return articles
+                    elif cached:
+                        print("Failed to fetch fresh articles, returning stale cache as fallback")
+                        return cached
+                    else:
+                        print("No articles available (both fetch failed and no cache)")
+                        return []
+
+                except Exception as e:
+                    print(f"Error fetching news: {e}")
+                    print(f"Error details: {type(e).__name__}")
+                    if cached:
+                        print("Returning stale cache due to error")
+                        return cached
+                    return []
+        finally:
+            if self._refresh_tasks.get(url) is asyncio.current_task():
+                del self._refresh_tasks[url]
+
+_news_service: Optional[NewsService] = None
 
 async def create_news_service() -> NewsService:
-    """Create and initialize the news service"""
-    return NewsService() 
\ No newline at end of file
+    """Get the shared news service, creating it on first use"""
+    global _news_service
+    if _news_service is None:
+        _news_service = NewsService()
+    return _news_service
@@ -1,31 +1,91 @@
 import pandas as pd
 import numpy as np
+import numexpr as ne
 from typing import Dict, Any, List, Optional, Tuple
 import os
-from api.services.data_fetcher import StockDataFetcher
+import asyncio
+from api.services.column_store import ColumnStore
+from api.services.http_client import close_http_client
+
+# Map top gainer period to change column
+PERIOD_MAP = {
+    "1w": "change_1w",
+    "1m": "change_1m",
+    "6m": "change_6m",
+    "ytd": "change_ytd",
+    "1y": "change_1y",
+    "3y": "change_3y"
+}
+
+def _top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k largest non-NaN values, largest first.
+    Like nlargest, ties are broken by position. Only the candidates are
+    sorted, after an O(n) partition around the k-th largest value.
+    """
+    rows = np.flatnonzero(~np.isnan(values))
+    if k <= 0:
+        return rows[:0]
+    values = values[rows]
+    if values.size > k:
+        threshold = np.partition(values, values.size - k)[values.size - k]
+        keep = values > threshold
+        ties = np.flatnonzero(values == threshold)[:k - np.count_nonzero(keep)]
+        keep[ties] = True
+        rows, values = rows[keep], values[keep]
+    return rows[np.argsort(-values, kind='stable')]
 
 class StockFilter:
-    def __init__(self):
-        self.fetcher = StockDataFetcher()
-        self._filters = []
-        self._data = None
+    """
+    Request-scoped filter over a shared screener DataFrame.
+    The base frame is never mutated; every query builds a new result.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        sort_index: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None,
+        display_df: Optional[pd.DataFrame] = None,
+        ticker_index: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        store: Optional[ColumnStore] = None
+    ):
+        self._df = df
+        self._store = store
+        self._sort_index = sort_index or {}
+        self._ticker_index = ticker_index
+        self._display_df = display_df if display_df is not None else df
+        self._filters: List[Tuple[str, str, float]] = []
+        self._sectors: Optional[List[str]] = None
+        self._ticker: Optional[str] = None
 
     @property
     def df(self) -> pd.DataFrame:
-        if self._data is None:
-            self._data = self.fetcher.get_dataframe()
-        return self._data
+        return self._df
+
+    @property
+    def store(self) -> ColumnStore:
+        """Column arrays of the base frame, used by the filters and scores"""
+        if self._store is None:
+            self._store = ColumnStore.from_frame(self._df)
+        return self._store
+
+    def _to_display(self, result: pd.DataFrame) -> pd.DataFrame:
+        """Swap result rows for their pre-rounded display rows"""
+        if self._display_df is self._df:
+            return result
+        return self._display_df.loc[result.index]
 
     def reset_filters(self):
         """Reset all filters"""
         self._filters = []
-        self._data = None
+        self._sectors = None
+        self._ticker = None
         return self
 
     def filter_by_ticker(self, ticker: str):
-        """Filter stocks by ticker symbol"""
+        """Filter stocks whose ticker symbol starts with the given prefix"""
         if ticker:
-            self._filters.append(lambda df: df['ticker'].str.contains(ticker.upper(), case=False))
+            self._ticker = ticker.upper()
         return self
 
     def get_available_sectors(self) -> List[str]:
@@ -35,62 +95,99 @@ class StockFilter:
     def filter_by_sector(self, sectors: List[str]):
         """Filter stocks by sector"""
         if sectors:
-            self._filters.append(lambda df: df['sector'].isin(sectors))
+            self._sectors = sectors
+
+    def _sector_mask(self, sectors: List[str]) -> np.ndarray:
+        """Match sectors through a lookup table indexed by category code"""
+        store = self.store
+        codes = store.sector_categories.get_indexer(sectors)
+        # One extra slot so code -1 (missing sector) always maps to False
+        lut = np.zeros(len(store.sector_categories) + 1, dtype=bool)
+        lut[codes[codes >= 0]] = True
+        return lut[store.sector_codes]
 
     def filter_by_market_cap(self, min_cap: Optional[float], max_cap: Optional[float]):
         """Filter stocks by market cap range"""
         if min_cap is not None:
-            self._filters.append(lambda df: df['market_cap'] >= min_cap)
+            self._filters.append(('market_cap', 'ge', min_cap))
         if max_cap is not None:
-            self._filters.append(lambda df: df['market_cap'] <= max_cap)
+            self._filters.append(('market_cap', 'le', max_cap))
 
     def filter_by_dividend_yield(self, min_yield: Optional[float], max_yield: Optional[float]):
         """Filter stocks by dividend yield range"""
         if min_yield is not None:
-            self._filters.append(lambda df: df['dividend_yield'] >= min_yield)
+            self._filters.append(('dividend_yield', 'ge', min_yield))
         if max_yield is not None:
-            self._filters.append(lambda df: df['dividend_yield'] <= max_yield)
+            self._filters.append(('dividend_yield', 'le', max_yield))
 
     def filter_by_peg(self, min_peg: Optional[float], max_peg: Optional[float]):
         """Filter stocks by PEG ratio range"""
         if min_peg is not None:
-            self._filters.append(lambda df: df['peg_ratio'] >= min_peg)
+            self._filters.append(('peg_ratio', 'ge', min_peg))
         if max_peg is not None:
-            self._filters.append(lambda df: df['peg_ratio'] <= max_peg)
+            self._filters.append(('peg_ratio', 'le', max_peg))
 
     def filter_by_pb(self, min_pb: Optional[float], max_pb: Optional[float]):
         """Filter stocks by P/B ratio range"""
         if min_pb is not None:
-            self._filters.append(lambda df: df['pb_ratio'] >= min_pb)
+            self._filters.append(('pb_ratio', 'ge', min_pb))
         if max_pb is not None:
-            self._filters.append(lambda df: df['pb_ratio'] <= max_pb)
+            self._filters.append(('pb_ratio', 'le', max_pb))
 
     def filter_by_pe(self, min_pe: Optional[float], max_pe: Optional[float]):
         """Filter stocks by P/E ratio range"""
         if min_pe is not None:
-            self._filters.append(lambda df: df['pe_forward'] >= min_pe)
+            self._filters.append(('pe_forward', 'ge', min_pe))
         if max_pe is not None:
-            self._filters.append(lambda df: df['pe_forward'] <= max_pe)
+            self._filters.append(('pe_forward', 'le', max_pe))
 
     def filter_by_eps_growth(self, min_growth: Optional[float]):
         """Filter stocks by EPS growth"""
         if min_growth is not None:
-            self._filters.append(lambda df: df['eps_growth_3y'] >= min_growth)
+            self._filters.append(('eps_growth_3y', 'ge', min_growth))
 
     def filter_by_revenue_growth(self, min_growth: Optional[float]):
         """Filter stocks by revenue growth"""
         if min_growth is not None:
-            self._filters.append(lambda df: df['revenue_growth_3y'] >= min_growth)
+            self._filters.append(('revenue_growth_3y', 'ge', min_growth))
 
     def filter_by_roe(self, min_roe: Optional[float]):
         """Filter stocks by ROE"""
         if min_roe is not None:
-            self._filters.append(lambda df: df['roe'] >= min_roe)
+            self._filters.append(('roe', 'ge', min_roe))
 
     def filter_by_roa(self, min_roa: Optional[float]):
         """Filter stocks by ROA"""
         if min_roa is not None:
-            self._filters.append(lambda df: df['roa'] >= min_roa)
+            self._filters.append(('roa', 'ge', min_roa))
+
+    def _build_mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Combine all filters into one boolean row mask over the base frame"""
+        # All (column, op, value) filters are fused into one kernel pass, so
+        # the frame is only sliced once
+        if self._filters:
+            mask = self.store.filter_mask(self._filters)
+        else:
+            mask = np.ones(len(df), dtype=bool)
+        if self._sectors:
+            mask &= self._sector_mask(self._sectors)
+        
+        if self._ticker:
+            ticker_mask = np.zeros(len(df), dtype=bool)
+            ticker_mask[self._match_ticker(df)] = True
+            mask &= ticker_mask
+        return mask
+
+    def _match_ticker(self, df: pd.DataFrame) -> np.ndarray:
+        """Row positions of the tickers starting with the ticker filter"""
+        if self._ticker_index is None:
+            return np.flatnonzero(df['ticker'].str.upper().str.startswith(self._ticker).to_numpy(dtype=bool))
+        # Tickers sharing a prefix are contiguous in sorted order, so two
+        # binary searches find all of them
+        tickers, order = self._ticker_index
+        start = np.searchsorted(tickers, self._ticker, side='left')
+        end = np.searchsorted(tickers, self._ticker + '\uffff', side='left')
+        return order[start:end]
 
     def get_results(
         self,
@@ -101,27 +198,36 @@ class StockFilter:
     ) -> Tuple[pd.DataFrame, int]:
         """
         Get filtered and sorted results with pagination
-        Returns: (DataFrame of results, total count of filtered results)
+        Returns: (DataFrame of the page rows with a fresh index, total count of filtered results)
         """
         df = self.df
+        start_idx = (page - 1) * limit
+        end_idx = start_idx + limit
+        
+        mask = self._build_mask(df)
         
-        # Apply all filters
-        for filter_func in self._filters:
-            df = df[filter_func(df)]
+        # Nothing matched or the page is past the end: skip sorting and slicing
+        total_count = int(np.count_nonzero(mask))
+        if not total_count or start_idx >= total_count:
+            return self._display_df.iloc[0:0].reset_index(drop=True), total_count
+        
+        # Use the precomputed sort order when there is one, so only the
+        # page rows are gathered from the frame
+        if sort_by in self._sort_index:
+            order = self._sort_index[sort_by][1 if sort_desc else 0]
+            order = order[mask[order]]
+            return self._display_df.iloc[order[start_idx:end_idx]].reset_index(drop=True), total_count
+        
+        df = df.iloc[np.flatnonzero(mask)]
         
         # Sort if specified
         if sort_by and sort_by in df.columns:
             df = df.sort_values(by=sort_by, ascending=not sort_desc)
         
-        # Calculate total count before pagination
-        total_count = len(df)
-        
         # Apply pagination
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
         df = df.iloc[start_idx:end_idx]
         
-        return df, total_count
+        return self._to_display(df).reset_index(drop=True), total_count
 
     def get_top_gainers(self, period: str = "1w", limit: int = 10) -> pd.DataFrame:
         """
@@ -134,52 +240,51 @@ class StockFilter:
         Returns:
             DataFrame containing top gainers with positive returns, sorted by return
         """
-        df = self.fetcher.get_dataframe()
-        
-        # Map period to column name
-        period_map = {
-            "1w": "change_1w",
-            "1m": "change_1m",
-            "6m": "change_6m",
-            "ytd": "change_ytd",
-            "1y": "change_1y",
-            "3y": "change_3y"
-        }
+        df = self.df
         
-        if period not in period_map:
+        if period not in PERIOD_MAP:
             period = "1w"
             
-        change_col = period_map[period]
+        change_col = PERIOD_MAP[period]
         
-        # Filter out invalid data
-        df = df[
-            (df['price'] > 0) &  # Remove zero/missing prices
-            (df[change_col].notna()) &  # Remove missing returns
-            (df[change_col] > 0)  # Keep only positive momentum
-        ]
+        store = self.store
+        change = store.arrays[change_col]
         
-        # Sort by return in descending order and take top N
-        return df.nlargest(limit, change_col)
+        # Filter out invalid data: zero/missing prices and missing or
+        # non-positive returns, using the cached positive-value masks
+        rows = np.flatnonzero(store.positive['price'] & store.positive[change_col])
+        
+        # Take the top N by return in descending order
+        return self._to_display(df.iloc[rows[_top_k(change[rows], limit)]])
 
     def get_highest_dividend_yields(self, limit: int = 10) -> pd.DataFrame:
         """Get stocks with highest dividend yields"""
-        return self.df[self.df['dividend_yield'] > 0].nlargest(limit, 'dividend_yield')
+        dividend_yield = self.store.arrays['dividend_yield']
+        rows = np.flatnonzero(self.store.positive['dividend_yield'])
+        return self._to_display(self.df.iloc[rows[_top_k(dividend_yield[rows], limit)]])
 
     def get_undervalued_growth_stocks(self, limit: int = 10) -> pd.DataFrame:
         """Get undervalued growth stocks"""
-        df = self.fetcher.get_dataframe()
-        # Consider stocks with high growth but low PE ratio
-        df['growth_score'] = df['eps_growth_3y'] + df['revenue_growth_3y']
-        df['value_score'] = 1 / (df['pe_forward'] + df['pb_ratio'])
-        df['combined_score'] = df['growth_score'] * df['value_score']
-        result = df.nlargest(limit, 'combined_score')
-        result = result.drop(['growth_score', 'value_score', 'combined_score'], axis=1)
-        return result
+        arrays = self.store.arrays
+        # Consider stocks with high growth but low PE ratio: growth score
+        # over valuation, evaluated by numexpr in one pass without temporaries
+        combined_score = ne.evaluate(
+            "(eps + rev) / (pe + pb)",
+            local_dict={
+                "eps": arrays['eps_growth_3y'],
+                "rev": arrays['revenue_growth_3y'],
+                "pe": arrays['pe_forward'],
+                "pb": arrays['pb_ratio'],
+            }
+        )
+        return self._to_display(self.df.iloc[_top_k(combined_score, limit)])
+
+async def main():
+    from api.services.data_fetcher import StockDataFetcher
 
-# Example usage
-if __name__ == "__main__":
     # Load and filter data
-    filter = StockFilter()
+    fetcher = StockDataFetcher()
+    filter = StockFilter(await fetcher.ensure_fresh())
     
     # Example: Get technology stocks with good growth and dividends
     results = (filter
@@ -199,4 +304,9 @@ if __name__ == "__main__":
     
     # Example: Get highest dividend yields
     print("\nHighest Dividend Yields:")
-    print(filter.reset_filters().get_highest_dividend_yields(limit=5)) 
\ No newline at end of file
+    print(filter.reset_filters().get_highest_dividend_yields(limit=5))
+    await close_http_client()
+
+# Example usage
+if __name__ == "__main__":
+    asyncio.run(main()) 
\ No newline at end of file
@@ -1,15 +1,17 @@
+import asyncio
 import logging
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from typing import List, Optional
 import uvicorn
-import traceback
 
 from api.routes import stocks
 from api.routes import news
-from api.services.data_fetcher import StockDataFetcher
+from api.services.data_fetcher import StockDataFetcher, periodic_refresh
+from api.services.http_client import close_http_client
 from api.services.stock_filter import StockFilter
+from api.services.news_scraper import close_browser
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -37,16 +39,17 @@ app.add_middleware(
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    logger.info(f"Incoming request to {request.url.path}")
-    logger.info(f"Request method: {request.method}")
-    logger.info(f"Request query params: {request.query_params}")
     try:
         response = await call_next(request)
-        logger.info(f"Response status code: {response.status_code}")
+        # One record per request, formatted only if INFO is enabled
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "%s %s?%s -> %s",
+                request.method, request.url.path, request.query_params, response.status_code
+            )
         return response
     except Exception as e:
-        logger.error(f"Error in request: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.error("Error in request: %s", e, exc_info=True)
         return JSONResponse(
             status_code=500,
             content={"error": str(e)}
@@ -56,6 +59,33 @@ async def log_requests(request: Request, call_next):
 app.include_router(stocks.router, prefix="/api/stocks", tags=["stocks"])
 app.include_router(news.router, prefix="/api/news", tags=["news"])
 
+# Interval between background refreshes of the stock data, in seconds
+REFRESH_INTERVAL = 600
+
+_refresh_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_stock_refresh():
+    global _refresh_task
+    _refresh_task = asyncio.create_task(periodic_refresh(stocks.fetcher, interval=REFRESH_INTERVAL))
+
+@app.on_event("shutdown")
+async def stop_stock_refresh():
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    await close_http_client()
+
+@app.on_event("shutdown")
+async def shutdown_browser():
+    await close_browser()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Scrynt API"}
@@ -1,9 +1,26 @@
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 import requests
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from typing import Iterator, List, Dict, Optional, Union
 from datetime import datetime
 import re
 
+# XPath expressions for the flex news layout, compiled once. Each field
+# query only returns the first match inside its container.
+_CONTAINER_XP = etree.XPath("//div[contains(@class, 'flex flex-col border-gray-300')]")
+_TITLE_XP = etree.XPath("(.//h3[contains(@class, 'text-xl font-bold')])[1]")
+_IMAGE_XP = etree.XPath("(.//div[contains(@class, 'group relative block')])[1]")
+_DESC_XP = etree.XPath("(.//p[contains(@class, 'overflow-auto')])[1]")
+_TIME_SOURCE_XP = etree.XPath("(.//div[contains(@class, 'text-faded')])[1]")
+
+# Matches the URL inside a CSS url(...) value
+_URL_RE = re.compile(r"url\(([^)]*)\)")
+
+# Shared session so repeated scrapes reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
 class FlexNewsArticle:
     def __init__(
         self,
@@ -33,7 +50,7 @@ def extract_image_url(style_attr: str) -> Optional[str]:
     if not style_attr:
         return None
     
-    match = re.search(r"url\((.*?)\)", style_attr)
+    match = _URL_RE.search(style_attr)
     if match:
         # Remove any quotes around the URL
         url = match.group(1).strip("'\"")
@@ -48,53 +65,74 @@ def parse_timestamp_source(timestamp_text: str) -> tuple[str, str]:
         return parts[0].strip(), parts[1].strip()
     return timestamp_text, ""
 
-def scrape_flex_news_articles(html_content: str) -> List[FlexNewsArticle]:
+def _first(xpath: etree.XPath, elem) -> Optional[lxml_html.HtmlElement]:
+    """Return the first element matched by a precompiled XPath, if any."""
+    matches = xpath(elem)
+    return matches[0] if matches else None
+
+def _get_text(elem) -> str:
+    """Concatenate the stripped text of an element and its descendants."""
+    return "".join(text.strip() for text in elem.itertext())
+
+def _iter_articles(html_content: Union[str, bytes]) -> Iterator[Dict]:
     """
-    Scrape news articles from HTML content that uses a flex-based layout structure.
-    Returns a list of FlexNewsArticle objects.
+    Parse news articles from HTML content that uses a flex-based layout structure.
+    Yields a dictionary of article information per news container, and
+    nothing for a document lxml cannot parse.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    articles = []
+    if not html_content or not html_content.strip():
+        return
+    try:
+        tree = lxml_html.fromstring(html_content)
+    except (etree.ParserError, ValueError) as e:
+        # Empty documents (e.g. only a comment) and str pages carrying an
+        # XML encoding declaration
+        print(f"Error parsing HTML: {str(e)}")
+        return
     
     # Find all news article containers with flex layout
-    news_containers = soup.find_all('div', class_=lambda x: x and 'flex flex-col border-gray-300' in x)
+    news_containers = _CONTAINER_XP(tree)
     
     for container in news_containers:
         try:
             # Extract title
-            title_elem = container.find('h3', class_=lambda x: x and 'text-xl font-bold' in x)
-            title = title_elem.get_text(strip=True) if title_elem else ""
+            title_elem = _first(_TITLE_XP, container)
+            title = _get_text(title_elem) if title_elem is not None else ""
             
             # Extract image URL
-            image_div = container.find('div', class_=lambda x: x and 'group relative block' in x)
+            image_div = _first(_IMAGE_XP, container)
             image_url = ""
-            if image_div and 'style' in image_div.attrs:
-                image_url = extract_image_url(image_div['style'])
+            if image_div is not None and 'style' in image_div.attrib:
+                image_url = extract_image_url(image_div.get('style'))
             
             # Extract description
-            desc_elem = container.find('p', class_=lambda x: x and 'overflow-auto' in x)
-            description = desc_elem.get_text(strip=True) if desc_elem else ""
+            desc_elem = _first(_DESC_XP, container)
+            description = _get_text(desc_elem) if desc_elem is not None else ""
             
             # Extract timestamp and source
-            time_source_elem = container.find('div', class_=lambda x: x and 'text-faded' in x)
+            time_source_elem = _first(_TIME_SOURCE_XP, container)
             timestamp, source = "", ""
-            if time_source_elem:
-                timestamp, source = parse_timestamp_source(time_source_elem.get_text(strip=True))
-            
-            article = FlexNewsArticle(
-                title=title,
-                image_url=image_url or "",
-                description=description,
-                timestamp=timestamp,
-                source=source
-            )
-            articles.append(article)
+            if time_source_elem is not None:
+                timestamp, source = parse_timestamp_source(_get_text(time_source_elem))
             
         except Exception as e:
             print(f"Error parsing article: {str(e)}")
             continue
-    
-    return articles
+        
+        yield {
+            "title": title,
+            "image_url": image_url or "",
+            "description": description,
+            "timestamp": timestamp,
+            "source": source
+        }
+
+def scrape_flex_news_articles(html_content: Union[str, bytes]) -> List[FlexNewsArticle]:
+    """
+    Scrape news articles from HTML content that uses a flex-based layout structure.
+    Returns a list of FlexNewsArticle objects.
+    """
+    return [FlexNewsArticle(**article) for article in _iter_articles(html_content)]
 
 def scrape_flex_news_from_url(url: str) -> List[Dict]:
     """
@@ -102,10 +140,10 @@ def scrape_flex_news_from_url(url: str) -> List[Dict]:
     Returns a list of dictionaries containing article information.
     """
     try:
-        response = requests.get(url)
+        response = _SESSION.get(url, timeout=5)
         response.raise_for_status()
-        articles = scrape_flex_news_articles(response.text)
-        return [article.to_dict() for article in articles]
+        # Raw bytes let lxml honour the page's own encoding declaration
+        return list(_iter_articles(response.content))
     except Exception as e:
         print(f"Error scraping URL {url}: {str(e)}")
         return [] 
\ No newline at end of file
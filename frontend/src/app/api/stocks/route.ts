@@ -1,4 +1,5 @@
 import { NextResponse } from 'next/server';
+import { rowsFromColumns } from '../../services/stockService';
 
 interface RawStockData {
   ticker: string;
@@ -15,7 +16,8 @@ interface ProcessedStockData {
 }
 
 interface BackendResponse {
-  data: RawStockData[];
+  columns: string[];
+  data: unknown[][];
   count: number;
   total_count: number;
   total_pages: number;
@@ -44,7 +46,7 @@ async function fetchStockData() {
 }
 
 function processStockData(backendResponse: BackendResponse) {
-  const stocksArray = backendResponse.data;
+  const stocksArray = rowsFromColumns<RawStockData>(backendResponse.columns, backendResponse.data);
   
   if (!stocksArray || stocksArray.length === 0) {
     return {
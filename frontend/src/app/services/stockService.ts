@@ -34,6 +34,28 @@ export interface StockResponse {
   last_updated: string;
 }
 
+// The /stocks endpoint sends column names once and one value array per column
+export interface ColumnarStockResponse extends Omit<StockResponse, 'data'> {
+  columns: string[];
+  data: unknown[][];
+  count: number;
+  current_page: number;
+}
+
+// Rebuild row objects from a columnar /stocks response
+export const rowsFromColumns = <T = StockData>(columns: string[], data: unknown[][]): T[] => {
+  const rowCount = data?.length ? data[0].length : 0;
+  const rows: T[] = new Array(rowCount);
+  for (let i = 0; i < rowCount; i++) {
+    const row: Record<string, unknown> = {};
+    for (let c = 0; c < columns.length; c++) {
+      row[columns[c]] = data[c][i];
+    }
+    rows[i] = row as T;
+  }
+  return rows;
+};
+
 // Cache configuration
 const CACHE_DURATION = 24 * 60 * 60 * 1000; // 24 hours
 let stockCache: {
@@ -69,12 +91,13 @@ export const fetchAllStocks = async (forceRefresh = false): Promise<{ data: Stoc
     
     try {
       while (true) {
-        const response = await axios.get<StockResponse>(`${API_BASE_URL}/stocks?page=${page}&limit=${limit}`);
-        allStocks = [...allStocks, ...response.data.data];
+        const response = await axios.get<ColumnarStockResponse>(`${API_BASE_URL}/stocks?page=${page}&limit=${limit}`);
+        const stocks = rowsFromColumns(response.data.columns, response.data.data);
+        allStocks = [...allStocks, ...stocks];
         lastUpdated = response.data.last_updated;
         
         // If we got fewer results than the limit, we've reached the end
-        if (response.data.data.length < limit || page * limit >= response.data.total_count) {
+        if (stocks.length < limit || page * limit >= response.data.total_count) {
           break;
         }
         
@@ -254,8 +277,9 @@ export const fetchStocks = async (
       queryParams.append('refresh', 'true');
     }
 
-    const response = await axios.get<StockResponse>(`${API_BASE_URL}/stocks?${queryParams}`);
-    return response.data;
+    const response = await axios.get<ColumnarStockResponse>(`${API_BASE_URL}/stocks?${queryParams}`);
+    const { columns, data, ...rest } = response.data;
+    return { ...rest, data: rowsFromColumns(columns, data) };
   } catch (error) {
     console.error('Error fetching stocks:', error);
     throw error;